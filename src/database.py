@@ -5,170 +5,435 @@ Designed for a single-user local app (easy to migrate to PostgreSQL later).
 """
 from __future__ import annotations
 
+import os
 import sqlite3
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 DEFAULT_DB = Path.cwd() / "stamps.db"
 
+# Stored in PRAGMA user_version once the schema is fully set up; bump it
+# whenever create_tables or the migrations change.
+SCHEMA_VERSION = 2
 
-def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+# Entries kept in each connection's tag name -> id LRU cache
+_TAG_CACHE_SIZE = 512
+
+
+
+class Connection(sqlite3.Connection):
+	"""sqlite3.Connection that also carries the helpers' per-connection state."""
+
+	def __init__(self, *args: Any, **kwargs: Any) -> None:
+		super().__init__(*args, **kwargs)
+		self._tx_depth = 0  # nesting depth of transaction() blocks
+		self._tag_cache: "OrderedDict[str, int]" = OrderedDict()
+
+
+RowFactory = Callable[[sqlite3.Cursor, tuple], Any]
+
+
+def get_connection(db_path: Optional[str] = None, *,
+				   row_factory: Optional[RowFactory] = None) -> Connection:
+	"""Open a tuned connection; rows are plain tuples unless ``row_factory`` is given."""
 	path = db_path or str(DEFAULT_DB)
-	conn = sqlite3.connect(path)
-	conn.row_factory = sqlite3.Row
+	conn = sqlite3.connect(path, factory=Connection)
+	if row_factory is not None:
+		conn.row_factory = row_factory
 	conn.execute("PRAGMA foreign_keys = ON")
+	if path != ":memory:":
+		# WAL + NORMAL: one log append per commit instead of a double fsync,
+		# and readers are not blocked while a write is in progress.
+		conn.execute("PRAGMA journal_mode = WAL")
+		conn.execute("PRAGMA synchronous = NORMAL")
+		conn.execute("PRAGMA mmap_size = 268435456")
+	conn.execute("PRAGMA temp_store = MEMORY")
+	conn.execute("PRAGMA cache_size = -65536")  # 64 MiB page cache
+	conn.execute("PRAGMA busy_timeout = 30000")
 	return conn
 
 
+@contextmanager
+def transaction(conn: Connection) -> Iterator[Connection]:
+	"""Group several writes into one transaction (and one fsync).
+
+	Helpers called inside the block do not commit, whatever their
+	``commit`` argument; the outermost block commits on success. On failure
+	only the block's own writes are rolled back. Blocks may be nested.
+	``conn`` must come from get_connection()/init_db().
+	"""
+	if not isinstance(conn, Connection):
+		raise TypeError("transaction() needs a connection opened by get_connection()")
+	depth = conn._tx_depth
+	began = not conn.in_transaction
+	if began:
+		conn.execute("BEGIN")
+	conn.execute("SAVEPOINT stampcollect_tx")
+	conn._tx_depth = depth + 1
+	try:
+		yield conn
+	except BaseException:
+		conn.execute("ROLLBACK TO stampcollect_tx")
+		conn.execute("RELEASE stampcollect_tx")
+		if depth == 0 and began:
+			conn.rollback()
+		# Tags created inside the block no longer exist.
+		conn._tag_cache.clear()
+		raise
+	else:
+		conn.execute("RELEASE stampcollect_tx")
+		if depth == 0:
+			conn.commit()
+	finally:
+		conn._tx_depth = depth
+
+
+@contextmanager
+def _atomic(conn: sqlite3.Connection, commit: bool) -> Iterator[None]:
+	"""Make one helper's writes all-or-nothing.
+
+	The writes run inside a savepoint, so a failure undoes only this
+	helper's writes and leaves any earlier uncommitted ones alone. On
+	success they are committed when ``commit`` is set and no transaction()
+	block is active.
+	"""
+	began = not conn.in_transaction
+	if began:
+		conn.execute("BEGIN")
+	conn.execute("SAVEPOINT stampcollect_op")
+	try:
+		yield
+	except BaseException:
+		conn.execute("ROLLBACK TO stampcollect_op")
+		conn.execute("RELEASE stampcollect_op")
+		if began:
+			conn.rollback()  # close the now-empty transaction we opened
+		raise
+	conn.execute("RELEASE stampcollect_op")
+	if commit and not _in_block(conn):
+		conn.commit()
+
+
+def _in_block(conn: sqlite3.Connection) -> bool:
+	return getattr(conn, "_tx_depth", 0) > 0
+
+
+def copy_legacy_db(legacy_path: str, db_path: str) -> bool:
+	"""Copy an existing database from ``legacy_path`` to a not-yet-created ``db_path``.
+
+	Uses the SQLite backup API so any pending WAL content comes along. The
+	copy is written to a temporary file and moved into place only once it
+	is complete, so a failed copy never leaves ``db_path`` behind.
+	Returns True if a copy was made.
+	"""
+	if os.path.exists(db_path) or not os.path.exists(legacy_path):
+		return False
+	fd, tmp_path = tempfile.mkstemp(prefix=".stamps-", suffix=".tmp",
+									dir=os.path.dirname(os.path.abspath(db_path)))
+	os.close(fd)
+	try:
+		src = sqlite3.connect(legacy_path)
+		try:
+			dst = sqlite3.connect(tmp_path)
+			try:
+				src.backup(dst)
+			finally:
+				dst.close()
+		finally:
+			src.close()
+		os.replace(tmp_path, db_path)
+	except BaseException:
+		if os.path.exists(tmp_path):
+			os.unlink(tmp_path)
+		raise
+	return True
+
+
 def migrate_add_missing_columns(conn: sqlite3.Connection) -> None:
 	"""Add missing columns to stamps table if they don't exist (for backwards compat)."""
 	cursor = conn.execute("PRAGMA table_info(stamps)")
 	existing_cols = {row[1] for row in cursor.fetchall()}
 	
-	needed = ["country", "year", "face_value", "condition", "catalog_number", "notes", "image_path", "created_at", "updated_at"]
-	for col in needed:
-		if col not in existing_cols:
-			col_type = "TEXT" if col in ["country", "face_value", "condition", "catalog_number", "notes", "image_path", "created_at", "updated_at"] else "INTEGER"
-			conn.execute(f"ALTER TABLE stamps ADD COLUMN {col} {col_type}")
+	needed = ["name", "country", "year", "face_value", "condition", "catalog_number", "notes", "image_path", "created_at", "updated_at"]
+	if existing_cols.issuperset(needed):
+		return
+	added = [col for col in needed if col not in existing_cols]
+	for col in added:
+		col_type = "TEXT" if col in ["name", "country", "face_value", "condition", "catalog_number", "notes", "image_path", "created_at", "updated_at"] else "INTEGER"
+		conn.execute(f"ALTER TABLE stamps ADD COLUMN {col} {col_type}")
 	
-	# Set created_at and updated_at to current datetime for existing rows
-	conn.execute("UPDATE stamps SET created_at = datetime('now') WHERE created_at IS NULL")
-	conn.execute("UPDATE stamps SET updated_at = datetime('now') WHERE updated_at IS NULL")
+	# Backfill timestamps only for columns that were just added; otherwise
+	# every start would rescan the whole table.
+	for col in ("created_at", "updated_at"):
+		if col in added:
+			conn.execute(f"UPDATE stamps SET {col} = datetime('now') WHERE {col} IS NULL")
 	conn.commit()
 
 
+_SCHEMA_SQL = """
+BEGIN;
+CREATE TABLE IF NOT EXISTS stamps (
+	id INTEGER PRIMARY KEY,
+	name TEXT,
+	country TEXT,
+	year INTEGER,
+	face_value TEXT,
+	condition TEXT,
+	catalog_number TEXT,
+	notes TEXT,
+	image_path TEXT,
+	created_at TEXT DEFAULT (datetime('now')),
+	updated_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE IF NOT EXISTS collections (
+	id INTEGER PRIMARY KEY,
+	name TEXT NOT NULL,
+	owner TEXT,
+	description TEXT,
+	created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE IF NOT EXISTS collection_items (
+	id INTEGER PRIMARY KEY,
+	collection_id INTEGER NOT NULL REFERENCES collections(id) ON DELETE CASCADE,
+	stamp_id INTEGER NOT NULL REFERENCES stamps(id) ON DELETE CASCADE,
+	acquisition_date TEXT,
+	purchase_price REAL
+);
+CREATE TABLE IF NOT EXISTS tags (
+	id INTEGER PRIMARY KEY,
+	name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stamp_tags (
+	stamp_id INTEGER NOT NULL REFERENCES stamps(id) ON DELETE CASCADE,
+	tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+	PRIMARY KEY (stamp_id, tag_id)
+);
+CREATE INDEX IF NOT EXISTS idx_stamps_country ON stamps(country);
+CREATE INDEX IF NOT EXISTS idx_stamps_catalog ON stamps(catalog_number);
+-- Covers the list_stamps/iter_stamps queries, including the GUI load's columns
+CREATE INDEX IF NOT EXISTS idx_stamps_list_cover ON stamps(created_at DESC, name, catalog_number, condition, image_path);
+CREATE INDEX IF NOT EXISTS idx_collection_items_collection ON collection_items(collection_id);
+COMMIT;
+"""
+
+
 def create_tables(conn: sqlite3.Connection) -> None:
-	"""Create tables only if they don't exist; separates each CREATE so ALTER works later."""
-	statements = [
-		"""CREATE TABLE IF NOT EXISTS stamps (
-			id INTEGER PRIMARY KEY,
-			name TEXT,
-			country TEXT,
-			year INTEGER,
-			face_value TEXT,
-			condition TEXT,
-			catalog_number TEXT,
-			notes TEXT,
-			image_path TEXT,
-			created_at TEXT DEFAULT (datetime('now')),
-			updated_at TEXT DEFAULT (datetime('now'))
-		)""",
-		"""CREATE TABLE IF NOT EXISTS collections (
-			id INTEGER PRIMARY KEY,
-			name TEXT NOT NULL,
-			owner TEXT,
-			description TEXT,
-			created_at TEXT DEFAULT (datetime('now'))
-		)""",
-		"""CREATE TABLE IF NOT EXISTS collection_items (
-			id INTEGER PRIMARY KEY,
-			collection_id INTEGER NOT NULL REFERENCES collections(id) ON DELETE CASCADE,
-			stamp_id INTEGER NOT NULL REFERENCES stamps(id) ON DELETE CASCADE,
-			acquisition_date TEXT,
-			purchase_price REAL
-		)""",
-		"""CREATE TABLE IF NOT EXISTS tags (
-			id INTEGER PRIMARY KEY,
-			name TEXT UNIQUE NOT NULL
-		)""",
-		"""CREATE TABLE IF NOT EXISTS stamp_tags (
-			stamp_id INTEGER NOT NULL REFERENCES stamps(id) ON DELETE CASCADE,
-			tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
-			PRIMARY KEY (stamp_id, tag_id)
-		)""",
-		"CREATE INDEX IF NOT EXISTS idx_stamps_country ON stamps(country)",
-		"CREATE INDEX IF NOT EXISTS idx_stamps_catalog ON stamps(catalog_number)",
-		"CREATE INDEX IF NOT EXISTS idx_collection_items_collection ON collection_items(collection_id)",
-	]
-	for stmt in statements:
-		conn.execute(stmt)
-	conn.commit()
+	"""Create tables and indexes only if they don't exist, in one executescript pass."""
+	conn.executescript(_SCHEMA_SQL)
 
 
-def init_db(db_path: Optional[str] = None) -> sqlite3.Connection:
+def init_db(db_path: Optional[str] = None, *,
+			row_factory: Optional[RowFactory] = None) -> sqlite3.Connection:
 	if db_path is None:
 		DEFAULT_DB.parent.mkdir(parents=True, exist_ok=True)
-	conn = get_connection(db_path)
-	
-	# Check if stamps table exists first
-	cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='stamps'")
-	stamps_exists = cursor.fetchone() is not None
+	conn = get_connection(db_path, row_factory=row_factory)
 	
-	if stamps_exists:
-		# Old DB: migrate columns first before creating indexes
-		migrate_add_missing_columns(conn)
-	
-	create_tables(conn)
+	if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+		# Check if stamps table exists first
+		cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='stamps'")
+		stamps_exists = cursor.fetchone() is not None
+		
+		if stamps_exists:
+			# Old DB: migrate columns first before creating indexes
+			migrate_add_missing_columns(conn)
+		
+		create_tables(conn)
+		conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+	# 0x10002: analyze every table now rather than only those queried so far.
+	conn.execute("PRAGMA optimize = 0x10002")
 	return conn
 
 
+_STAMP_COLUMNS = ("name", "country", "year", "face_value", "condition", "catalog_number", "notes", "image_path")
+
+# SQL text is kept byte-identical between calls so sqlite3's per-connection
+# statement cache can hand back the already-compiled statement.
+_INSERT_STAMP_SQL = (
+	"INSERT INTO stamps (name, country, year, face_value, condition, catalog_number, notes, image_path) "
+	"VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_ALL_STAMP_COLUMNS = ("id",) + _STAMP_COLUMNS + ("created_at", "updated_at")
+_LIST_STAMP_COLUMNS = ("id", "name", "catalog_number", "condition")
+_GET_STAMP_SQL = f"SELECT {', '.join(_ALL_STAMP_COLUMNS)} FROM stamps WHERE id = ?"
+
+
+@lru_cache(maxsize=64)
+def _update_stamp_sql(keys: Tuple[str, ...]) -> str:
+	assignments = ", ".join(f"{k} = ?" for k in keys)
+	return f"UPDATE stamps SET {assignments}, updated_at = datetime('now') WHERE id = ?"
+
+
 def add_stamp(conn: sqlite3.Connection, *, name: str, country: Optional[str] = None,
 			  year: Optional[int] = None, face_value: Optional[str] = None,
 			  condition: Optional[str] = None, catalog_number: Optional[str] = None,
-			  notes: Optional[str] = None, image_path: Optional[str] = None) -> int:
-	cur = conn.execute(
-		"""
-		INSERT INTO stamps (name, country, year, face_value, condition, catalog_number, notes, image_path)
-		VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-		""",
-		(name, country, year, face_value, condition, catalog_number, notes, image_path),
-	)
-	conn.commit()
-	return cur.lastrowid
+			  notes: Optional[str] = None, image_path: Optional[str] = None,
+			  commit: bool = True) -> int:
+	row = {
+		"name": name, "country": country, "year": year, "face_value": face_value,
+		"condition": condition, "catalog_number": catalog_number, "notes": notes,
+		"image_path": image_path,
+	}
+	return add_stamps(conn, [row], commit=commit)[0]
+
+
+def add_stamps(conn: sqlite3.Connection, rows: List[Dict[str, object]],
+			   commit: bool = True) -> List[int]:
+	"""Insert many stamps with one executemany; returns the new ids in order.
+
+	Missing keys in a row dict are stored as NULL.
+	"""
+	if not rows:
+		return []
+	params = [tuple(r.get(col) for col in _STAMP_COLUMNS) for r in rows]
+	with _atomic(conn, commit):
+		conn.executemany(_INSERT_STAMP_SQL, params)
+		last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+	first_id = last_id - len(params) + 1
+	return list(range(first_id, last_id + 1))
 
 
 def get_stamp(conn: sqlite3.Connection, stamp_id: int) -> Optional[sqlite3.Row]:
-	cur = conn.execute("SELECT * FROM stamps WHERE id = ?", (stamp_id,))
+	cur = conn.cursor()
+	cur.row_factory = sqlite3.Row
+	cur.execute(_GET_STAMP_SQL, (stamp_id,))
 	return cur.fetchone()
 
 
-def list_stamps(conn: sqlite3.Connection, limit: int = 100) -> List[sqlite3.Row]:
-	cur = conn.execute("SELECT * FROM stamps ORDER BY created_at DESC LIMIT ?", (limit,))
-	return cur.fetchall()
+@lru_cache(maxsize=16)
+def _list_stamps_sql(columns: Tuple[str, ...]) -> str:
+	unknown = set(columns) - set(_ALL_STAMP_COLUMNS)
+	if unknown:
+		raise ValueError(f"Unknown stamp column(s): {', '.join(sorted(unknown))}")
+	return f"SELECT {', '.join(columns)} FROM stamps ORDER BY created_at DESC LIMIT ?"
 
 
-def find_stamps(conn: sqlite3.Connection, filters: Dict[str, object]) -> List[sqlite3.Row]:
-	clauses = []
-	params: List[object] = []
-	for k, v in filters.items():
-		clauses.append(f"{k} = ?")
-		params.append(v)
-	where = " AND ".join(clauses) if clauses else "1"
-	cur = conn.execute(f"SELECT * FROM stamps WHERE {where}", params)
-	return cur.fetchall()
+def iter_stamps(conn: sqlite3.Connection, limit: Optional[int] = None,
+				columns: Tuple[str, ...] = _LIST_STAMP_COLUMNS) -> Iterator[tuple]:
+	"""Yield the newest stamps straight from the cursor; ``limit=None`` means all rows."""
+	yield from conn.execute(_list_stamps_sql(tuple(columns)), (-1 if limit is None else limit,))
 
 
-def update_stamp(conn: sqlite3.Connection, stamp_id: int, fields: Dict[str, object]) -> None:
-	if not fields:
-		return
-	assignments = ", ".join(f"{k} = ?" for k in fields.keys())
-	params = list(fields.values()) + [stamp_id]
-	conn.execute(f"UPDATE stamps SET {assignments}, updated_at = datetime('now') WHERE id = ?", params)
-	conn.commit()
+def list_stamps(conn: sqlite3.Connection, limit: int = 100,
+				columns: Tuple[str, ...] = _LIST_STAMP_COLUMNS) -> List[tuple]:
+	"""Return the newest stamps, selecting only ``columns`` (id, name, catalog_number, condition by default)."""
+	return list(iter_stamps(conn, limit, columns))
 
 
-def delete_stamp(conn: sqlite3.Connection, stamp_id: int) -> None:
-	conn.execute("DELETE FROM stamps WHERE id = ?", (stamp_id,))
-	conn.commit()
+def list_stamps_full(conn: sqlite3.Connection, limit: int = 100) -> List[tuple]:
+	"""Like list_stamps, but with every column."""
+	return list_stamps(conn, limit, _ALL_STAMP_COLUMNS)
 
 
-def add_tag(conn: sqlite3.Connection, name: str) -> int:
-	cur = conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,))
-	conn.commit()
-	if cur.lastrowid:
-		return cur.lastrowid
-	cur = conn.execute("SELECT id FROM tags WHERE name = ?", (name,))
-	row = cur.fetchone()
-	return int(row[0])
+_ALLOWED_FILTER_COLS = frozenset({"country", "year", "face_value", "condition", "catalog_number"})
 
 
-def tag_stamp(conn: sqlite3.Connection, stamp_id: int, tag_name: str) -> None:
-	tag_id = add_tag(conn, tag_name)
-	conn.execute("INSERT OR IGNORE INTO stamp_tags (stamp_id, tag_id) VALUES (?, ?)", (stamp_id, tag_id))
-	conn.commit()
+@lru_cache(maxsize=64)
+def _find_stamps_sql(keys: Tuple[str, ...]) -> str:
+	where = " AND ".join(f"{k} = ?" for k in keys) if keys else "1"
+	return f"SELECT * FROM stamps WHERE {where}"
+
+
+def find_stamps(conn: sqlite3.Connection, filters: Dict[str, object]) -> List[sqlite3.Row]:
+	unknown = set(filters) - _ALLOWED_FILTER_COLS
+	if unknown:
+		raise ValueError(f"Unsupported filter column(s): {', '.join(sorted(unknown))}")
+	keys = tuple(sorted(filters))
+	params = [filters[k] for k in keys]
+	cur = conn.cursor()
+	cur.row_factory = sqlite3.Row
+	cur.execute(_find_stamps_sql(keys), params)
+	return cur.fetchall()
+
+
+def update_stamp(conn: sqlite3.Connection, stamp_id: int, fields: Dict[str, object],
+				 commit: bool = True) -> None:
+	if not fields:
+		return
+	unknown = set(fields) - set(_STAMP_COLUMNS)
+	if unknown:
+		raise ValueError(f"Unknown stamp column(s): {', '.join(sorted(unknown))}")
+	keys = tuple(sorted(fields))
+	params = [fields[k] for k in keys] + [stamp_id]
+	with _atomic(conn, commit):
+		conn.execute(_update_stamp_sql(keys), params)
+
+
+def delete_stamp(conn: sqlite3.Connection, stamp_id: int, commit: bool = True) -> None:
+	with _atomic(conn, commit):
+		conn.execute("DELETE FROM stamps WHERE id = ?", (stamp_id,))
+
+
+_INSERT_TAG_SQL = "INSERT OR IGNORE INTO tags (name) VALUES (?)"
+_SELECT_TAG_ID_SQL = "SELECT id FROM tags WHERE name = ?"
+_INSERT_STAMP_TAG_SQL = "INSERT OR IGNORE INTO stamp_tags (stamp_id, tag_id) VALUES (?, ?)"
+
+
+def _lookup_or_insert_tag(conn: sqlite3.Connection, name: str, commit: bool) -> Tuple[int, bool]:
+	"""Return the tag id and whether it is safe to cache.
+
+	Inside a transaction() block any id is safe, because the block clears
+	the cache if it rolls back. Outside one, only committed ids are.
+	"""
+	in_block = _in_block(conn)
+	clean = not conn.in_transaction
+	with _atomic(conn, commit):
+		cur = conn.execute(_INSERT_TAG_SQL, (name,))
+	# lastrowid is connection-wide and goes stale when the insert is ignored
+	if cur.rowcount == 1:
+		return cur.lastrowid, in_block or commit
+	cur = conn.execute(_SELECT_TAG_ID_SQL, (name,))
+	row = cur.fetchone()
+	return int(row[0]), in_block or clean
+
+
+def add_tag(conn: sqlite3.Connection, name: str, commit: bool = True) -> int:
+	"""Return the id of tag ``name``, creating it if needed.
+
+	On connections from get_connection() ids are kept in a small LRU cache
+	so repeated tags skip the database. A tag created by an uncommitted
+	insert is not cached, since a rollback would leave the cached id
+	pointing nowhere.
+	"""
+	cache = getattr(conn, "_tag_cache", None)
+	if cache is None:
+		return _lookup_or_insert_tag(conn, name, commit)[0]
+	tag_id = cache.get(name)
+	if tag_id is not None:
+		cache.move_to_end(name)
+		return tag_id
+	tag_id, cacheable = _lookup_or_insert_tag(conn, name, commit)
+	if cacheable:
+		cache[name] = tag_id
+		if len(cache) > _TAG_CACHE_SIZE:
+			cache.popitem(last=False)
+	return tag_id
+
+
+def tag_stamp(conn: sqlite3.Connection, stamp_id: int, tag_name: str, commit: bool = True) -> None:
+	"""Attach tag ``tag_name`` to a stamp, creating the tag if needed, with at most one commit.
+
+	A cached tag costs a single INSERT; only the first use of a tag in a
+	session touches the tags table.
+	"""
+	try:
+		with _atomic(conn, commit):
+			tag_id = add_tag(conn, tag_name, commit=False)
+			conn.execute(_INSERT_STAMP_TAG_SQL, (stamp_id, tag_id))
+	except sqlite3.Error:
+		# The cached id may belong to a tag that has since been rolled back.
+		getattr(conn, "_tag_cache", {}).pop(tag_name, None)
+		raise
 
 
 def close(conn: sqlite3.Connection) -> None:
+	try:
+		conn.execute("PRAGMA optimize")
+	except sqlite3.ProgrammingError:
+		return  # already closed; close() stays safe to call twice
 	conn.close()
 
 
@@ -1,9 +1,14 @@
 import os
+import sqlite3
+from pathlib import Path
 import wx
 from stamp import Stamp, StampCollection
 import database
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "stamps.db")
+# Where the database lived before it moved out of the source tree
+LEGACY_DB_PATH = os.path.join(os.path.dirname(__file__), "stamps.db")
+# Set STAMPCOLLECT_DB=:memory: to run without touching disk (e.g. in tests)
+DB_PATH = os.environ.get("STAMPCOLLECT_DB", str(Path.home() / ".stampcollect" / "stamps.db"))
 
 
 class StampCollectionGUI(wx.Frame):
@@ -11,14 +16,36 @@ class StampCollectionGUI(wx.Frame):
         super(StampCollectionGUI, self).__init__(parent, title=title, size=(600, 400))
 
         self.collection = StampCollection()
+        startup_message = self._prepare_db_path()
         self.conn = database.init_db(DB_PATH)
         self.image_path = None
         self._load_from_db()
 
         self.InitUI()
+        if startup_message:
+            self.output_text.AppendText(f"{startup_message}\n")
         self.Centre()
         self.Show()
 
+    def _prepare_db_path(self):
+        """Create the database directory and carry over a pre-move src/stamps.db.
+
+        Returns a message for the output box, or None.
+        """
+        if DB_PATH == ":memory:":
+            return None
+        Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+        if "STAMPCOLLECT_DB" in os.environ:
+            return None
+        try:
+            copied = database.copy_legacy_db(LEGACY_DB_PATH, DB_PATH)
+        except (sqlite3.Error, OSError) as exc:
+            return (f"Could not copy existing stamp collection from {LEGACY_DB_PATH} ({exc}); "
+                    f"the old file was left untouched.")
+        if copied:
+            return f"Copied existing stamp collection from {LEGACY_DB_PATH} to {DB_PATH}"
+        return None
+
     def InitUI(self):
         panel = wx.Panel(self)
 
@@ -104,23 +131,22 @@ class StampCollectionGUI(wx.Frame):
     def _save_to_db(self, stamp: Stamp) -> None:
         # Map simple GUI fields into the general stamps table
         condition = "Used" if getattr(stamp, "used", False) else "Mint"
-        database.add_stamp(
-            self.conn,
-            name=stamp.description,
-            catalog_number=stamp.scott_number,
-            condition=condition,
-            image_path=getattr(stamp, "image_path", None),
-        )
+        with database.transaction(self.conn):
+            database.add_stamp(
+                self.conn,
+                name=stamp.description,
+                catalog_number=stamp.scott_number,
+                condition=condition,
+                image_path=getattr(stamp, "image_path", None),
+                commit=False,
+            )
 
     def _load_from_db(self) -> None:
-        rows = database.list_stamps(self.conn, limit=1000)
-        for r in rows:
-            name = r["name"] or ""
-            catalog = r["catalog_number"] or ""
-            condition = (r["condition"] or "").lower()
-            used = True if "used" in condition else False
-            image_path = r["image_path"]
-            stamp = Stamp(name, catalog, used, image_path)
+        rows = database.iter_stamps(self.conn, limit=1000,
+                                    columns=("name", "catalog_number", "condition", "image_path"))
+        for name, catalog, condition, image_path in rows:
+            used = True if "used" in (condition or "").lower() else False
+            stamp = Stamp(name or "", catalog or "", used, image_path)
             self.collection.add_stamp(stamp)
 
     def OnAddStamp(self, event):
@@ -142,13 +168,12 @@ class StampCollectionGUI(wx.Frame):
             self.output_text.AppendText("Please enter both description and Scott number.\n")
 
     def OnListStamps(self, event):
-        self.output_text.AppendText("Stamps in collection:\n")
-        for stamp in self.collection.list_stamps():
-            self.output_text.AppendText(f"{stamp}\n")
-        self.output_text.AppendText("\n")
+        # Build the text up front: one AppendText means one repaint, not one per stamp
+        lines = "".join(f"{stamp}\n" for stamp in self.collection.list_stamps())
+        self.output_text.AppendText(f"Stamps in collection:\n{lines}\n")
 
     def OnExit(self, event):
-        self.conn.close()
+        database.close(self.conn)
         self.Destroy()
 
     def OnBrowseImage(self, event):
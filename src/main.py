@@ -1,9 +1,7 @@
-from database import init_db
 from gui import run_gui
 
 
 def main():
-    init_db()
     run_gui()
 
 
@@ -1,4 +1,12 @@
+# Bits in StampCollection._flags
+USED = 1
+PLATE_BLOCK = 2
+
+
 class Stamp:
+    __slots__ = ("description", "scott_number", "used", "qtyUsed", "qtyMint",
+                 "plateBlock", "year", "usedPrice", "mintPrice", "image_path")
+
     def __init__(self, description, scott_number, used=False, image_path=None):
         self.description = description
         self.scott_number = scott_number
@@ -17,17 +25,90 @@ class Stamp:
 
 
 class StampCollection:
+    """A list of stamps plus a packed flag byte per stamp for fast counts.
+
+    The flags are a snapshot of ``used``/``plateBlock`` taken when a stamp
+    is added. Changing those on a stamp afterwards is not reflected in
+    count_used() or count_plate_blocks() until update_stamp() is called.
+    """
+
+    __slots__ = ("stamps", "_idx", "_flags")
+
     def __init__(self):
         self.stamps = []
+        self._idx = {}  # id(stamp) -> position in self.stamps
+        self._flags = bytearray()  # USED | PLATE_BLOCK bits, parallel to self.stamps
+
+    @staticmethod
+    def _flags_of(stamp):
+        return (USED if stamp.used else 0) | (PLATE_BLOCK if stamp.plateBlock else 0)
 
     def add_stamp(self, stamp):
-        """Add a stamp to the collection."""
+        """Add a stamp to the collection.
+
+        Raises ValueError if this same Stamp object is already in it.
+        """
+        if id(stamp) in self._idx:
+            raise ValueError(f"{stamp!r} is already in the collection")
+        flags = self._flags_of(stamp)
+        self._idx[id(stamp)] = len(self.stamps)
         self.stamps.append(stamp)
+        self._flags.append(flags)
+
+    def update_stamp(self, stamp, **fields):
+        """Set attributes on a stamp in the collection and refresh its flags.
+
+        With no fields it just re-syncs the flags, e.g. after the stamp was
+        changed directly. On error the stamp and collection are left unchanged.
+        """
+        pos = self._idx.get(id(stamp))
+        if pos is None:
+            raise ValueError(f"{stamp!r} is not in the collection")
+        old = {name: getattr(stamp, name) for name in fields}
+        try:
+            for name, value in fields.items():
+                setattr(stamp, name, value)
+            flags = self._flags_of(stamp)
+        except Exception:
+            for name, value in old.items():
+                setattr(stamp, name, value)
+            raise
+        self._flags[pos] = flags
 
     def remove_stamp(self, stamp):
-        """Remove a stamp from the collection."""
-        if stamp in self.stamps:
-            self.stamps.remove(stamp)
+        """Remove a stamp from the collection.
+
+        The last stamp is moved into the freed slot, so removal is O(1) but
+        does not preserve insertion order.
+        """
+        pos = self._idx.pop(id(stamp), None)
+        if pos is None:
+            return
+        for column in (self.stamps, self._flags):
+            last = column.pop()
+            if pos < len(column):
+                column[pos] = last
+        if pos < len(self.stamps):
+            self._idx[id(self.stamps[pos])] = pos
+
+    def count_used(self):
+        """Return the number of used stamps in the collection."""
+        # Each byte is one of four values, so bytearray.count keeps this in C.
+        return self._flags.count(USED) + self._flags.count(USED | PLATE_BLOCK)
+
+    def count_plate_blocks(self):
+        """Return the number of plate blocks in the collection."""
+        return self._flags.count(PLATE_BLOCK) + self._flags.count(USED | PLATE_BLOCK)
+
+    def find(self, scott_number=None, used=None, plate_block=None, year=None):
+        """Return the stamps matching every criterion that is not None."""
+        return [
+            s for s in self.stamps
+            if (scott_number is None or s.scott_number == scott_number)
+            and (used is None or bool(s.used) == used)
+            and (plate_block is None or bool(s.plateBlock) == plate_block)
+            and (year is None or s.year == year)
+        ]
 
     def list_stamps(self):
         """Return a list of all stamps in the collection."""
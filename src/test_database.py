@@ -0,0 +1,333 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import database
+
+
+class TestAddStamps(unittest.TestCase):
+    def setUp(self):
+        self.conn = database.init_db(":memory:")
+
+    def tearDown(self):
+        database.close(self.conn)
+
+    def _count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM stamps").fetchone()[0]
+
+    def test_returns_ids_in_order(self):
+        ids = database.add_stamps(self.conn, [{"name": "a"}, {"name": "b", "year": 1918}])
+        self.assertEqual(ids, [1, 2])
+        self.assertEqual(database.get_stamp(self.conn, 2)["year"], 1918)
+
+    def test_failed_bulk_insert_is_rolled_back(self):
+        rows = [{"name": "a"}, {"name": "b"}, {"name": object()}]
+        with self.assertRaises(sqlite3.Error):
+            database.add_stamps(self.conn, rows)
+        self.assertFalse(self.conn.in_transaction)
+        database.add_stamp(self.conn, name="c")
+        self.assertEqual(self._count(), 1)
+
+    def test_failed_bulk_insert_without_commit_keeps_earlier_writes(self):
+        database.add_stamp(self.conn, name="kept", commit=False)
+        rows = [{"name": "a"}, {"name": object()}]
+        with self.assertRaises(sqlite3.Error):
+            database.add_stamps(self.conn, rows, commit=False)
+        self.assertTrue(self.conn.in_transaction)
+        self.conn.commit()
+        self.assertEqual([r[1] for r in database.list_stamps(self.conn)], ["kept"])
+
+
+class TestFindStamps(unittest.TestCase):
+    def setUp(self):
+        self.conn = database.init_db(":memory:")
+        database.add_stamps(self.conn, [
+            {"name": "Inverted Jenny", "country": "USA", "year": 1918},
+            {"name": "Curtiss Jenny", "country": "USA", "year": 1918},
+            {"name": "Penny Black", "country": "UK", "year": 1840},
+        ])
+
+    def tearDown(self):
+        database.close(self.conn)
+
+    def test_rejects_columns_outside_allow_list(self):
+        for key in ("name", "1=1; --"):
+            with self.assertRaises(ValueError):
+                database.find_stamps(self.conn, {key: "x"})
+
+    def test_filter_key_order_does_not_matter(self):
+        a = database.find_stamps(self.conn, {"country": "USA", "year": 1918})
+        b = database.find_stamps(self.conn, {"year": 1918, "country": "USA"})
+        self.assertEqual(len(a), 2)
+        self.assertEqual([tuple(r) for r in a], [tuple(r) for r in b])
+
+
+class TestUpdateStamp(unittest.TestCase):
+    def setUp(self):
+        self.conn = database.init_db(":memory:")
+        self.sid = database.add_stamp(self.conn, name="a")
+
+    def tearDown(self):
+        database.close(self.conn)
+
+    def test_updates_fields(self):
+        database.update_stamp(self.conn, self.sid, {"year": 1918, "country": "USA"})
+        row = database.get_stamp(self.conn, self.sid)
+        self.assertEqual((row["year"], row["country"]), (1918, "USA"))
+
+    def test_rejects_unknown_columns(self):
+        for key in ("id", "created_at", "name = 'x' --"):
+            with self.assertRaises(ValueError):
+                database.update_stamp(self.conn, self.sid, {key: 1})
+        self.assertEqual(database.get_stamp(self.conn, self.sid)["name"], "a")
+
+
+class TestTransaction(unittest.TestCase):
+    def setUp(self):
+        self.conn = database.init_db(":memory:")
+
+    def tearDown(self):
+        database.close(self.conn)
+
+    def _names(self):
+        return sorted(r[1] for r in database.list_stamps(self.conn))
+
+    def test_commits_on_success(self):
+        with database.transaction(self.conn):
+            sid = database.add_stamp(self.conn, name="a", commit=False)
+            database.tag_stamp(self.conn, sid, "t", commit=False)
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self._names(), ["a"])
+
+    def test_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with database.transaction(self.conn):
+                database.add_stamp(self.conn, name="a")
+                raise RuntimeError
+        self.assertEqual(self._names(), [])
+
+    def test_helpers_do_not_commit_inside_block(self):
+        with self.assertRaises(RuntimeError):
+            with database.transaction(self.conn):
+                database.add_stamp(self.conn, name="a")  # commit=True by default
+                self.assertTrue(self.conn.in_transaction)
+                raise RuntimeError
+        self.assertEqual(self._names(), [])
+
+    def test_starts_inside_an_open_implicit_transaction(self):
+        database.add_stamp(self.conn, name="pending", commit=False)
+        with database.transaction(self.conn):
+            database.add_stamp(self.conn, name="a")
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self._names(), ["a", "pending"])
+
+    def test_failed_helper_keeps_earlier_uncommitted_writes(self):
+        database.add_stamp(self.conn, name="pending", commit=False)
+        with self.assertRaises(sqlite3.Error):
+            database.add_stamp(self.conn, name=object())
+        self.assertTrue(self.conn.in_transaction)
+        database.add_stamp(self.conn, name="a")
+        self.assertEqual(self._names(), ["a", "pending"])
+
+    def test_depth_is_per_connection(self):
+        other = database.init_db(":memory:")
+        try:
+            with database.transaction(self.conn):
+                database.add_stamp(other, name="a")
+                self.assertFalse(other.in_transaction)
+        finally:
+            database.close(other)
+
+    def test_requires_helper_connection(self):
+        plain = sqlite3.connect(":memory:")
+        with self.assertRaises(TypeError):
+            with database.transaction(plain):
+                pass
+        plain.close()
+
+    def test_nested_failure_only_undoes_inner_block(self):
+        with database.transaction(self.conn):
+            database.add_stamp(self.conn, name="outer")
+            with self.assertRaises(RuntimeError):
+                with database.transaction(self.conn):
+                    database.add_stamp(self.conn, name="inner")
+                    raise RuntimeError
+        self.assertEqual(self._names(), ["outer"])
+
+
+class TestTags(unittest.TestCase):
+    def setUp(self):
+        self.conn = database.init_db(":memory:")
+        self.sid = database.add_stamp(self.conn, name="a")
+
+    def tearDown(self):
+        database.close(self.conn)
+
+    def _tags_of(self, stamp_id):
+        cur = self.conn.execute(
+            "SELECT t.name FROM stamp_tags st JOIN tags t ON t.id = st.tag_id WHERE st.stamp_id = ?",
+            (stamp_id,))
+        return [r[0] for r in cur]
+
+    def test_repeat_tag_reuses_id(self):
+        self.assertEqual(database.add_tag(self.conn, "x"), database.add_tag(self.conn, "x"))
+        database.tag_stamp(self.conn, self.sid, "x")
+        database.tag_stamp(self.conn, self.sid, "x")
+        self.assertEqual(self._tags_of(self.sid), ["x"])
+
+    def test_cache_is_per_connection(self):
+        database.add_tag(self.conn, "x")
+        database.add_tag(self.conn, "y")
+        other = database.init_db(":memory:")
+        try:
+            self.assertEqual(database.add_tag(other, "y"), 1)
+        finally:
+            database.close(other)
+
+    def test_cache_evicts_least_recently_used(self):
+        with mock.patch.object(database, "_TAG_CACHE_SIZE", 2):
+            database.add_tag(self.conn, "a")
+            database.add_tag(self.conn, "b")
+            database.add_tag(self.conn, "a")  # hit: "b" is now the oldest
+            database.add_tag(self.conn, "c")
+        self.assertEqual(list(self.conn._tag_cache), ["a", "c"])
+
+    def test_plain_connection_works_without_cache(self):
+        plain = sqlite3.connect(":memory:")
+        database.create_tables(plain)
+        self.assertEqual(database.add_tag(plain, "x"), database.add_tag(plain, "x"))
+        plain.close()
+
+    def test_retry_after_failed_tag_stamp_and_rollback(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            database.tag_stamp(self.conn, 999, "rare")
+        self.conn.rollback()
+        database.tag_stamp(self.conn, self.sid, "rare")
+        self.assertEqual(self._tags_of(self.sid), ["rare"])
+
+    def test_uncommitted_tag_is_not_cached_across_rollback(self):
+        database.add_tag(self.conn, "draft", commit=False)
+        database.tag_stamp(self.conn, self.sid, "draft", commit=False)
+        self.conn.rollback()
+        database.tag_stamp(self.conn, self.sid, "draft")
+        self.assertEqual(self._tags_of(self.sid), ["draft"])
+
+    def test_tag_created_in_rolled_back_block_is_forgotten(self):
+        with self.assertRaises(RuntimeError):
+            with database.transaction(self.conn):
+                database.tag_stamp(self.conn, self.sid, "gone")
+                raise RuntimeError
+        database.tag_stamp(self.conn, self.sid, "gone")
+        self.assertEqual(self._tags_of(self.sid), ["gone"])
+
+
+class TestClose(unittest.TestCase):
+    def test_close_twice(self):
+        conn = database.init_db(":memory:")
+        database.close(conn)
+        database.close(conn)
+
+
+class TestCopyLegacyDb(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.legacy = os.path.join(self.tmp.name, "old.db")
+        self.target = os.path.join(self.tmp.name, "new.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copies_when_target_missing(self):
+        conn = database.init_db(self.legacy)
+        database.add_stamp(conn, name="Blue Penny")
+        database.close(conn)
+        self.assertTrue(database.copy_legacy_db(self.legacy, self.target))
+        conn = database.init_db(self.target)
+        self.assertEqual([r[1] for r in database.list_stamps(conn)], ["Blue Penny"])
+        database.close(conn)
+
+    def test_never_overwrites_existing_target(self):
+        database.close(database.init_db(self.legacy))
+        database.close(database.init_db(self.target))
+        self.assertFalse(database.copy_legacy_db(self.legacy, self.target))
+
+    def test_failed_copy_leaves_no_target(self):
+        with open(self.legacy, "wb") as f:
+            f.write(b"not a sqlite database" * 100)
+        with self.assertRaises(sqlite3.DatabaseError):
+            database.copy_legacy_db(self.legacy, self.target)
+        self.assertEqual(os.listdir(self.tmp.name), ["old.db"])
+
+    def test_no_legacy_db(self):
+        self.assertFalse(database.copy_legacy_db(self.legacy, self.target))
+        self.assertFalse(os.path.exists(self.target))
+
+
+class TestInitDb(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "stamps.db")
+        database.close(database.init_db(self.path))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_current_schema_version_skips_setup(self):
+        with mock.patch.object(database, "migrate_add_missing_columns") as migrate, \
+                mock.patch.object(database, "create_tables") as create:
+            conn = database.init_db(self.path)
+        database.close(conn)
+        migrate.assert_not_called()
+        create.assert_not_called()
+
+    def test_older_schema_version_runs_setup(self):
+        conn = database.get_connection(self.path)
+        conn.execute("PRAGMA user_version = 1")
+        database.close(conn)
+        with mock.patch.object(database, "migrate_add_missing_columns") as migrate, \
+                mock.patch.object(database, "create_tables") as create:
+            conn = database.init_db(self.path)
+        database.close(conn)
+        migrate.assert_called_once()
+        create.assert_called_once()
+
+    def test_migration_is_a_no_op_on_current_columns(self):
+        conn = database.get_connection(self.path)
+        statements = []
+        conn.set_trace_callback(statements.append)
+        database.migrate_add_missing_columns(conn)
+        conn.set_trace_callback(None)
+        database.close(conn)
+        self.assertEqual(statements, ["PRAGMA table_info(stamps)"])
+
+
+class TestLegacySchema(unittest.TestCase):
+    def test_opens_db_with_original_stamps_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "legacy.db")
+            old = sqlite3.connect(path)
+            old.execute("""CREATE TABLE stamps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                description TEXT,
+                scott_number TEXT,
+                used INTEGER
+            )""")
+            old.execute("INSERT INTO stamps (description, scott_number, used) VALUES ('Old', '1', 0)")
+            old.commit()
+            old.close()
+
+            conn = database.init_db(path)
+            try:
+                cols = {r[1] for r in conn.execute("PRAGMA table_info(stamps)")}
+                self.assertTrue({"name", "catalog_number", "created_at"} <= cols)
+                self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], database.SCHEMA_VERSION)
+                self.assertEqual(len(database.list_stamps(conn)), 1)
+                database.add_stamp(conn, name="New")
+            finally:
+                database.close(conn)
+
+
+if __name__ == "__main__":
+    unittest.main()
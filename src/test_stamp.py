@@ -0,0 +1,103 @@
+import unittest
+
+from stamp import Stamp, StampCollection
+
+
+def make_stamp(scott, used=False, year=None, plate_block=False):
+    stamp = Stamp(f"Stamp {scott}", scott, used)
+    stamp.year = year
+    stamp.plateBlock = plate_block
+    return stamp
+
+
+class TestStampCollection(unittest.TestCase):
+    def setUp(self):
+        self.collection = StampCollection()
+
+    def test_find(self):
+        jenny = make_stamp("C3a", used=True, year=1918)
+        self.collection.add_stamp(jenny)
+        self.collection.add_stamp(make_stamp("C3", year=1918))
+        self.assertEqual(self.collection.find(used=True, year=1918), [jenny])
+        self.assertEqual(self.collection.count_used(), 1)
+
+    def test_year_is_free_form(self):
+        stamp = make_stamp("1", year="1918")
+        self.collection.add_stamp(stamp)
+        self.assertEqual(self.collection.find(year="1918"), [stamp])
+
+    def test_find_sees_direct_changes(self):
+        stamp = make_stamp("1", used=True)
+        self.collection.add_stamp(stamp)
+        stamp.used = False
+        self.assertEqual(self.collection.find(used=True), [])
+
+    def assertIndexConsistent(self):
+        c = self.collection
+        self.assertEqual(c._idx, {id(s): pos for pos, s in enumerate(c.stamps)})
+        self.assertEqual(len(c._flags), len(c.stamps))
+        for pos, stamp in enumerate(c.stamps):
+            self.assertEqual(c._flags[pos], StampCollection._flags_of(stamp))
+
+    def test_remove_keeps_index_and_columns_consistent(self):
+        stamps = [make_stamp(str(i), used=i % 2 == 0, year=1900 + i) for i in range(6)]
+        for stamp in stamps:
+            self.collection.add_stamp(stamp)
+        for stamp in (stamps[0], stamps[5], stamps[2], stamps[0]):
+            self.collection.remove_stamp(stamp)
+            self.assertIndexConsistent()
+        self.assertEqual(sorted(s.scott_number for s in self.collection.stamps), ["1", "3", "4"])
+        self.assertEqual(self.collection.count_used(), 1)
+        for stamp in list(self.collection.stamps):
+            self.collection.remove_stamp(stamp)
+        self.assertEqual(len(self.collection), 0)
+        self.assertIndexConsistent()
+
+    def test_adding_same_stamp_twice_is_rejected(self):
+        stamp = make_stamp("1")
+        self.collection.add_stamp(stamp)
+        with self.assertRaises(ValueError):
+            self.collection.add_stamp(stamp)
+        self.collection.remove_stamp(stamp)
+        self.assertEqual(len(self.collection), 0)
+        self.assertIndexConsistent()
+
+    def test_equal_but_distinct_stamps_are_both_kept(self):
+        self.collection.add_stamp(make_stamp("1"))
+        self.collection.add_stamp(make_stamp("1"))
+        self.assertEqual(len(self.collection), 2)
+
+    def test_update_stamp_refreshes_flags(self):
+        stamp = make_stamp("1", used=True)
+        self.collection.add_stamp(stamp)
+        self.collection.update_stamp(stamp, used=False, plateBlock=True, year=1918)
+        self.assertFalse(stamp.used)
+        self.assertEqual(self.collection.count_used(), 0)
+        self.assertEqual(self.collection.count_plate_blocks(), 1)
+        self.assertEqual(self.collection.find(used=True), [])
+        self.assertEqual(self.collection.find(year=1918, plate_block=True), [stamp])
+
+    def test_update_stamp_resyncs_direct_changes(self):
+        stamp = make_stamp("1", used=True)
+        self.collection.add_stamp(stamp)
+        stamp.used = False
+        self.assertEqual(self.collection.count_used(), 1)  # snapshot until re-synced
+        self.collection.update_stamp(stamp)
+        self.assertEqual(self.collection.count_used(), 0)
+
+    def test_failed_update_leaves_stamp_and_flags_unchanged(self):
+        stamp = make_stamp("1", used=True, year=1918)
+        self.collection.add_stamp(stamp)
+        with self.assertRaises(AttributeError):
+            self.collection.update_stamp(stamp, used=False, colour="red")
+        self.assertTrue(stamp.used)
+        self.assertEqual(stamp.year, 1918)
+        self.assertEqual(self.collection.count_used(), 1)
+
+    def test_update_unknown_stamp(self):
+        with self.assertRaises(ValueError):
+            self.collection.update_stamp(make_stamp("1"), used=True)
+
+
+if __name__ == "__main__":
+    unittest.main()